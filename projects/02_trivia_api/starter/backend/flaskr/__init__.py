@@ -1,34 +1,103 @@
 import os
-from flask import Flask, request, abort, jsonify
+from flask import Flask, request, abort, Response
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-import random
+from sqlalchemy import func, insert
+from sqlalchemy.exc import SQLAlchemyError
+import orjson
+import redis
 
-from models import setup_db, Question, Category
+from models import setup_db, db, Question, Category
 
 QUESTIONS_PER_PAGE = 10
 
+'''
+Redis cache for read-mostly queries, requests fall back
+to the database whenever Redis is unavailable
+'''
+REDIS_HOST = os.getenv('REDIS_HOST', '127.0.0.1')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+CATEGORIES_CACHE_KEY = "categories:v1"
+CATEGORIES_CACHE_TTL = 600
+
+cache = redis.Redis(
+  host=REDIS_HOST,
+  port=REDIS_PORT,
+  decode_responses=True,
+  socket_connect_timeout=0.1,
+  socket_timeout=0.1,
+)
+
+'''
+Returns a JSON response encoded with orjson,
+category ids are allowed as non-string keys
+'''
+def ojsonify(data):
+  return Response(
+    orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS),
+    mimetype="application/json"
+  )
+
+'''
+Returns the selected questions as plain dictionaries, 
+reading the columns directly instead of building Question objects
+'''
+def format_questions(selection):
+  rows = selection.with_entities(*Question.__table__.columns).all()
+  return [row._asdict() for row in rows]
+
 '''
 Returns questions to be displayed on current page
 '''
 def paginated_questions(request, selection):
   page = request.args.get("page", 1, type=int)
+  if page < 1:
+    abort(404)
   start = (page - 1) * QUESTIONS_PER_PAGE
-  end = start + QUESTIONS_PER_PAGE
 
-  questions = [question.format() for question in selection]
-  current_questions = questions[start:end]
+  return format_questions(selection.limit(QUESTIONS_PER_PAGE).offset(start))
 
-  return current_questions
+'''
+Returns questions following after_id in id order (keyset pagination),
+so deep pages are fetched without scanning the skipped rows
+'''
+def keyset_page(selection, after_id):
+  return format_questions(selection
+    .filter(Question.id > after_id)
+    .order_by(Question.id)
+    .limit(QUESTIONS_PER_PAGE))
 
 '''
-Returns {"id":"type"} formatted dictionary for category
+Returns {"id":"type"} formatted dictionary for category,
+served from the cache when possible
 '''
 def get_categories():
-  categories = Category.query.order_by(Category.id).all()
-  categories_dict = {}
-  for category in categories:
-    categories_dict.update({category.id:category.type})
+  try:
+    cached = cache.get(CATEGORIES_CACHE_KEY)
+  except redis.RedisError:
+    cached = None
+
+  if cached is not None:
+    return {
+      int(category_id): category_type
+      for category_id, category_type in orjson.loads(cached).items()
+    }
+
+  categories = (Category.query
+    .with_entities(Category.id, Category.type)
+    .order_by(Category.id)
+    .all())
+  categories_dict = dict(categories)
+
+  try:
+    cache.setex(
+      CATEGORIES_CACHE_KEY,
+      CATEGORIES_CACHE_TTL,
+      orjson.dumps(categories_dict, option=orjson.OPT_NON_STR_KEYS)
+    )
+  except redis.RedisError:
+    pass
+
   return categories_dict
 
 def create_app(test_config=None):
@@ -37,22 +106,15 @@ def create_app(test_config=None):
   setup_db(app)
   
   '''
-  Allow CORS for every domain and route
+  Allow CORS for every domain and route, 
+  setting Access-Control-Allow headers and methods
   '''
-  CORS(app, resources={r"/*": {"origins": "*"}})
-
-  '''
-  Setting Access-Control-Allow
-  '''
-  @app.after_request
-  def after_request(response):
-    response.headers.add(
-      "Access-Control-Allow-Headers", "Content-Type,Authorization,true"
-    )
-    response.headers.add(
-      "Access-Control-Allow-Methods", "GET,POST,DELETE,OPTIONS"
-    )
-    return response
+  CORS(
+    app,
+    resources={r"/*": {"origins": "*"}},
+    allow_headers=["Content-Type", "Authorization", "true"],
+    methods=["GET", "POST", "DELETE", "OPTIONS"],
+  )
 
   '''
   Handling GET requests to fetch 
@@ -65,7 +127,7 @@ def create_app(test_config=None):
     if len(categories) == 0:
       abort(404)
 
-    return jsonify(
+    return ojsonify(
       {
         "success": True,
         "categories": categories,
@@ -77,22 +139,29 @@ def create_app(test_config=None):
   including pagination (every 10 questions). 
   This endpoint should return a list of questions, 
   number of total questions, current category, categories. 
+  Passing after_id instead of page walks the questions by id.
   '''
   @app.route("/questions")
   def retrieve_questions():
-    selection = Question.query.order_by(Question.id).all()
-    current_questions = paginated_questions(request, selection)
+    after_id = request.args.get("after_id", None, type=int)
+
+    if after_id is None:
+      selection = Question.query.order_by(Question.id)
+      current_questions = paginated_questions(request, selection)
+    else:
+      current_questions = keyset_page(Question.query, after_id)
 
     if len(current_questions) == 0:
       abort(404)
 
-    return jsonify(
+    return ojsonify(
       {
         "success": True,
         "questions": current_questions,
-        "total_questions": len(Question.query.all()),
+        "total_questions": Question.query.count(),
         "categories": get_categories(),
-        "current_category": "All"
+        "current_category": "All",
+        "next_after_id": current_questions[-1]["id"]
       }
     )
 
@@ -108,16 +177,15 @@ def create_app(test_config=None):
         abort(404)
 
       question.delete()
-      selection = Question.query.order_by(Question.id).all()
-      current_questions = paginated_questions(request, selection)
 
-      return jsonify(
+      return ojsonify(
         {
           "success": True,
           "deleted": question_id,
         }
       )
-    except:
+    except SQLAlchemyError:
+      db.session.rollback()
       abort(422)
 
   '''
@@ -126,8 +194,8 @@ def create_app(test_config=None):
   category, and difficulty score.
 
   Also, getting questions based on a search term. 
-  It should return any questions for whom the search term 
-  is a substring of the question. 
+  It should return any questions whose text matches the 
+  search term using Postgres full-text search. 
   '''
   @app.route("/questions", methods=["POST"])
   def create_questions():
@@ -142,31 +210,78 @@ def create_app(test_config=None):
     try:
       if search:
         selection = Question.query.order_by(Question.id).filter(
-          Question.question.ilike("%{}%".format(search))
+          func.to_tsvector("english", Question.question)
+          .op("@@")(func.plainto_tsquery("english", search))
         )
         current_questions = paginated_questions(request, selection)
 
-        return jsonify(
+        return ojsonify(
           {
               "success": True,
               "questions": current_questions,
-              "total_questions": len(selection.all()),
+              "total_questions": selection.count(),
               "current_category": "All"
           }
         )
       else:
-        question = Question(question=new_question, answer=new_answer, difficulty=new_difficulty, category=new_category)
-        question.insert()
-
-        selection = Question.query.order_by(Question.id).all()
-        current_questions = paginated_questions(request, selection)
+        question_id = db.session.execute(
+          insert(Question.__table__).returning(Question.__table__.c.id),
+          {
+            "question": new_question,
+            "answer": new_answer,
+            "difficulty": new_difficulty,
+            "category": new_category,
+          }
+        ).scalar()
+        db.session.commit()
 
-        return jsonify(
+        return ojsonify(
           {
               "success": True,
+              "created": question_id,
           }
         )
-    except:
+    except SQLAlchemyError:
+        db.session.rollback()
+        abort(422)
+
+  '''
+  Endpoint to POST a list of new questions at once, 
+  each requiring the question and answer text, 
+  category, and difficulty score. 
+  All questions are written with a single INSERT statement. 
+  '''
+  @app.route("/questions/bulk", methods=["POST"])
+  def create_questions_in_bulk():
+    body = request.get_json()
+
+    if not isinstance(body, list) or len(body) == 0:
+      abort(400)
+
+    if not all(isinstance(question, dict) for question in body):
+      abort(400)
+
+    try:
+      new_questions = [
+        {
+          "question": question.get("question", None),
+          "answer": question.get("answer", None),
+          "difficulty": question.get("difficulty", None),
+          "category": question.get("category", None),
+        }
+        for question in body
+      ]
+      db.session.execute(insert(Question.__table__).values(new_questions))
+      db.session.commit()
+
+      return ojsonify(
+        {
+            "success": True,
+            "created": len(new_questions),
+        }
+      )
+    except SQLAlchemyError:
+        db.session.rollback()
         abort(422)
 
   '''
@@ -174,18 +289,21 @@ def create_app(test_config=None):
   '''
   @app.route("/categories/<int:category_id>/questions")
   def retrieve_questions_by_category(category_id):
-    selection = Question.query.filter(Question.category == category_id).all()
+    selection = Question.query.filter(Question.category == category_id).order_by(Question.id)
     current_questions = paginated_questions(request, selection)
 
     if len(current_questions) == 0:
       abort(404)
 
-    return jsonify(
+    return ojsonify(
       {
         "success": True,
         "questions": current_questions,
-        "total_questions": len(current_questions),
-        "current_category": Category.query.get(category_id).type
+        "total_questions": selection.count(),
+        "current_category": (Category.query
+          .with_entities(Category.type)
+          .filter(Category.id == category_id)
+          .scalar())
       }
     )
 
@@ -203,23 +321,16 @@ def create_app(test_config=None):
     quiz_category = body.get("quiz_category", None)
     category_id = quiz_category.get('id')
     
-    if(category_id == 0): # all category
-      rand_question = random.choice(Question.query
-        .filter(~(Question.id.in_(prev_questions)))
-        .all())
-    else: # selected category
-      rand_question = random.choice(Question.query
-        .filter
-        (
-          Question.category == category_id, 
-          ~(Question.id.in_(prev_questions))
-        )
-        .all())
+    selection = Question.query.filter(~(Question.id.in_(prev_questions)))
+    if(category_id != 0): # selected category
+      selection = selection.filter(Question.category == category_id)
+
+    rand_question = selection.order_by(func.random()).limit(1).first()
 
     if rand_question == None:
       abort(404)
 
-    return jsonify(
+    return ojsonify(
       {
         "success": True,
         "question": rand_question.format()
@@ -233,28 +344,28 @@ def create_app(test_config=None):
   @app.errorhandler(404)
   def not_found(error):
     return (
-      jsonify({"success": False, "error": 404, "message": "resource not found"}),
+      ojsonify({"success": False, "error": 404, "message": "resource not found"}),
       404,
     )
 
   @app.errorhandler(422)
   def unprocessable(error):
     return (
-      jsonify({"success": False, "error": 422, "message": "unprocessable"}),
+      ojsonify({"success": False, "error": 422, "message": "unprocessable"}),
       422,
     )
 
   @app.errorhandler(400)
   def bad_request(error):
     return (
-      jsonify({"success": False, "error": 400, "message": "bad request"}),
+      ojsonify({"success": False, "error": 400, "message": "bad request"}),
       400,
     )
 
   @app.errorhandler(500)
   def internal_server_error(error):
     return (
-      jsonify({"success": False, "error": 500, "message": "internal server error"}),
+      ojsonify({"success": False, "error": 500, "message": "internal server error"}),
       500,
     )
   
@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+import sys
+
+# gunicorn loads this file before adding the app directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+'''
+Gunicorn settings for serving the trivia API
+
+gevent workers keep serving other requests while one waits on Postgres,
+the worker count is capped so that every worker can fill its connection pool
+without going over the max_connections of the Postgres server
+'''
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 100))
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = max(1, min(
+    int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)),
+    DB_MAX_CONNECTIONS // (DB_POOL_SIZE + DB_MAX_OVERFLOW),
+))
+worker_class = 'gevent'
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 500))
+
+'''
+Makes psycopg2 yield to other greenlets while a query is in flight
+'''
+def post_fork(server, worker):
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
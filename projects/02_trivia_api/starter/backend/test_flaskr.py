@@ -70,6 +70,16 @@ class TriviaTestCase(unittest.TestCase):
         self.assertTrue(data["categories"])
         self.assertTrue(data["current_category"])
 
+    def test_get_questions_after_id(self):
+        res = self.client().get("/questions?after_id=10")
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data["success"], True)
+        self.assertTrue(len(data["questions"]))
+        self.assertTrue(all(q["id"] > 10 for q in data["questions"]))
+        self.assertEqual(data["next_after_id"], data["questions"][-1]["id"])
+
     def test_404_sent_requesting_beyond_valid_page(self):
         res = self.client().get("/questions?page=1000")
         data = json.loads(res.data)
@@ -78,14 +88,26 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data["success"], False)
         self.assertEqual(data["message"], "resource not found")
     
+    def test_404_sent_requesting_page_zero(self):
+        res = self.client().get("/questions?page=0")
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(data["success"], False)
+        self.assertEqual(data["message"], "resource not found")
+    
     def test_get_questions_by_category(self):
         res = self.client().get("/categories/1/questions")
         data = json.loads(res.data)
 
+        with self.app.app_context():
+            total = Question.query.filter(Question.category == 1).count()
+
         self.assertEqual(res.status_code, 200)
         self.assertEqual(data["success"], True)
-        self.assertTrue(data["total_questions"])
+        self.assertEqual(data["total_questions"], total)
         self.assertTrue(len(data["questions"]))
+        self.assertEqual(len(data["questions"]), min(total, 10))
         self.assertEqual(data["current_category"], "Science")
 
     def test_404_sent_non_existant_category(self):
@@ -103,7 +125,7 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(data["success"], True)
         self.assertTrue(data["total_questions"])
-        self.assertEqual(len(data["questions"]), 2)
+        self.assertEqual(len(data["questions"]), 1)
         self.assertTrue(data["current_category"])
 
     def test_get_question_search_without_results(self):
@@ -122,6 +144,24 @@ class TriviaTestCase(unittest.TestCase):
         
         self.assertEqual(res.status_code, 200)
         self.assertEqual(data['success'], True)
+        self.assertTrue(data['created'])
+
+    def test_create_new_questions_in_bulk(self):
+        res = self.client().post("/questions/bulk",
+            json=[self.new_question, self.new_question])
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['created'], 2)
+
+    def test_400_sent_empty_bulk_questions(self):
+        res = self.client().post("/questions/bulk", json=[])
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'bad request')
 
     def test_404_sent_invalid_question_info(self):
         res = self.client().post("/books", json=self.invalild_question)
@@ -142,13 +182,13 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data['deleted'], 24)
         self.assertEqual(question, None)
 
-    def test_422_if_question_does_not_exist(self):
+    def test_404_if_question_does_not_exist(self):
         res = self.client().delete("/questions/1000")
         data = json.loads(res.data)
 
-        self.assertEqual(res.status_code, 422)
+        self.assertEqual(res.status_code, 404)
         self.assertEqual(data["success"], False)
-        self.assertEqual(data["message"], "unprocessable")
+        self.assertEqual(data["message"], "resource not found")
 
     def test_get_categories(self):
         res = self.client().get("/categories")
@@ -179,7 +219,7 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data["success"], True)
         self.assertTrue(data["question"])
 
-    def test_500_sent_requesting_invalid_param(self):
+    def test_404_sent_no_question_left(self):
         res = self.client().post("/quizzes", 
             json={
                 "previous_questions": [11, 13, 15], 
@@ -188,9 +228,9 @@ class TriviaTestCase(unittest.TestCase):
         )
         data = json.loads(res.data)
 
-        self.assertEqual(res.status_code, 500)
+        self.assertEqual(res.status_code, 404)
         self.assertEqual(data["success"], False)
-        self.assertEqual(data["message"], "internal server error")
+        self.assertEqual(data["message"], "resource not found")
 
 # Make the tests conveniently executable
 if __name__ == "__main__":
@@ -1,17 +1,81 @@
 import os
-from flask import Flask, request, jsonify, abort
+from flask import Flask, request, abort, Response
 from sqlalchemy import exc
-import json
+import orjson
+import redis
 from flask_cors import CORS
 
-from .database.models import db_drop_and_create_all, setup_db, Drink
+from .database.models import db_drop_and_create_all, setup_db, db, Drink
 from .auth.auth import AuthError, requires_auth
 
 app = Flask(__name__)
 setup_db(app)
 CORS(app)
 
+'''
+Returns a JSON response encoded with orjson
+'''
+def ojsonify(data):
+    return Response(orjson.dumps(data), mimetype='application/json')
+
+'''
+Redis cache for the public drinks list
+    requests fall back to the database whenever Redis is unavailable
+'''
+REDIS_HOST = os.getenv('REDIS_HOST', '127.0.0.1')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+DRINKS_CACHE_KEY = 'drinks:short:v1'
+DRINKS_CACHE_TTL = 60
+
+cache = redis.Redis(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    decode_responses=True,
+    socket_connect_timeout=0.1,
+    socket_timeout=0.1,
+)
+
+'''
+Drops the cached drinks list, called after every change to the drinks
+'''
+def invalidate_drinks_cache():
+    try:
+        cache.delete(DRINKS_CACHE_KEY)
+    except redis.RedisError:
+        pass
+
+'''
+Wraps a serialized drinks list in a JSON response
+    answering 304 Not Modified when the client already has the same body
+'''
+def drinks_response(body):
+    response = Response(body, mimetype='application/json')
+    response.add_etag()
+    return response.make_conditional(request)
+
 db_drop_and_create_all()
+invalidate_drinks_cache()
+
+'''
+Validates a recipe from a request body
+    a single ingredient object is accepted as a one item list
+    returns the list of ingredients, each having a color and parts
+        or None if the recipe is malformed
+'''
+def parse_recipe(recipe):
+    if isinstance(recipe, dict):
+        recipe = [recipe]
+
+    if not isinstance(recipe, list):
+        return None
+
+    for ingredient in recipe:
+        if not isinstance(ingredient, dict):
+            return None
+        if 'color' not in ingredient or 'parts' not in ingredient:
+            return None
+
+    return recipe
 
 # ROUTES
 '''
@@ -19,25 +83,37 @@ Handling GET requests to fetch all drinks
     containing only the drink.short() data representation
     returns status code 200 and json {"success": True, "drinks": drinks} where drinks is the list of drinks
         or 404 status code indicating entity not found
+    the response body is cached in Redis and carries an ETag
 '''
 @app.route("/drinks")
 def retrieve_drinks():
-    drinks = Drink.query.all()
+    try:
+        cached = cache.get(DRINKS_CACHE_KEY)
+    except redis.RedisError:
+        cached = None
 
-    if len(drinks) == 0:
-        abort(404)
+    if cached is not None:
+        return drinks_response(cached)
+
+    drinks_list = Drink.short_rows()
 
-    drinks_list = []
-    for drink in drinks:
-        drinks_list.append(drink.short())
+    if len(drinks_list) == 0:
+        abort(404)
 
-    return jsonify(
+    body = orjson.dumps(
         {
             "success": True, 
             "drinks": drinks_list,
         }
     )
 
+    try:
+        cache.setex(DRINKS_CACHE_KEY, DRINKS_CACHE_TTL, body)
+    except redis.RedisError:
+        pass
+
+    return drinks_response(body)
+
 '''
 Handling GET requests to fetch all drinks in detail
     it requires the 'get:drinks-detail' permission
@@ -53,11 +129,9 @@ def retrieve_drinks_detail(self):
     if len(drinks) == 0:
         abort(404)
 
-    drinks_list = []
-    for drink in drinks:
-        drinks_list.append(drink.long())
+    drinks_list = [drink.long() for drink in drinks]
 
-    return jsonify(
+    return ojsonify(
         {
             "success": True, 
             "drinks": drinks_list,
@@ -76,22 +150,32 @@ Endpoint to add a new drink
 def create_drinks(self):
     body = request.get_json()
     drink_list = []
+
+    if body is None or 'title' not in body or 'recipe' not in body:
+        abort(422)
+
+    recipe = parse_recipe(body['recipe'])
+
+    if recipe is None:
+        abort(422)
     
     try:
         new_drink = Drink(
             title = body['title'],
-            recipe = json.dumps(body['recipe'])
+            recipe = recipe
         )
         new_drink.insert()
+        invalidate_drinks_cache()
         drink_list.append(new_drink.long())
         
-        return jsonify(
+        return ojsonify(
             {
                 "success": True, 
                 "drinks": drink_list,
             }
         )
-    except:
+    except exc.SQLAlchemyError:
+        db.session.rollback()
         abort(422)
 
 '''
@@ -110,21 +194,35 @@ def update_drinks(self, drink_id):
     if drink is None:
         abort(404)
 
+    body = request.get_json()
+
+    if body is None:
+        abort(422)
+
+    if 'recipe' in body:
+        recipe = parse_recipe(body['recipe'])
+
+        if recipe is None:
+            abort(422)
+
     try:    
-        body = request.get_json()
-        drink.title = body.get('title')
-        drink.recipe = json.dumps(body.get('recipe'))
+        if 'title' in body:
+            drink.title = body['title']
+        if 'recipe' in body:
+            drink.recipe = recipe
         drink.update()
+        invalidate_drinks_cache()
         drink_list = []
         drink_list.append(drink.long())
         
-        return jsonify(
+        return ojsonify(
             {
                 "success": True, 
                 "drinks": drink_list,
             }
         )
-    except:
+    except exc.SQLAlchemyError:
+        db.session.rollback()
         abort(422)
 
 '''
@@ -145,13 +243,15 @@ def delete_drinks(self, drink_id):
 
     try:
         drink.delete()
-        return jsonify(
+        invalidate_drinks_cache()
+        return ojsonify(
             {
                 "success": True, 
                 "delete": drink.id,
             }
         )
-    except:
+    except exc.SQLAlchemyError:
+        db.session.rollback()
         abort(422)
 
 # Error Handling
@@ -160,7 +260,7 @@ Error handling for unprocessable entity
 '''
 @app.errorhandler(422)
 def unprocessable(error):
-    return jsonify({
+    return ojsonify({
         "success": False,
         "error": 422,
         "message": "unprocessable"
@@ -171,7 +271,7 @@ Error handler for entity not found
 '''
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
+    return ojsonify({
         "success": False,
         "error": 404,
         "message": "resource not found"
@@ -183,6 +283,6 @@ A standardized way to communicate auth failure modes
 '''
 @app.errorhandler(AuthError)
 def unauthorized(ex):
-    response = jsonify(ex.error)
+    response = ojsonify(ex.error)
     response.status_code = ex.status_code
     return response
\ No newline at end of file
@@ -1,6 +1,9 @@
 import json
+import threading
+import time
 from flask import request, _request_ctx_stack
 from functools import wraps
+from http.client import HTTPException
 from jose import jwt
 from urllib.request import urlopen
 
@@ -9,6 +12,20 @@ AUTH0_DOMAIN = 'fsnd3469.us.auth0.com'
 ALGORITHMS = ['RS256']
 API_AUDIENCE = 'coffee'
 
+## JWKS Cache
+'''
+Auth0 signing keys by key id (kid), fetched from /.well-known/jwks.json
+    refreshed every JWKS_CACHE_TTL seconds,
+    or when a token names an unknown kid (at most every JWKS_MIN_REFRESH seconds)
+    a failed refresh keeps the previous keys and is retried after JWKS_MIN_REFRESH seconds
+    a fetch gives up after JWKS_FETCH_TIMEOUT seconds
+'''
+JWKS_CACHE_TTL = 600
+JWKS_MIN_REFRESH = 60
+JWKS_FETCH_TIMEOUT = 5
+_jwks_cache = {'keys': {}, 'expires_at': 0, 'retry_at': 0}
+_jwks_lock = threading.Lock()
+
 ## AuthError Exception
 '''
 AuthError Exception
@@ -82,6 +99,75 @@ def check_permissions(permission, payload):
         }, 403)
     return True
 
+'''
+Fetches the Auth0 JWKS and stores the RSA keys by kid in the cache
+'''
+def fetch_jwks():
+    jsonurl = urlopen(
+        f'https://{AUTH0_DOMAIN}/.well-known/jwks.json',
+        timeout=JWKS_FETCH_TIMEOUT
+    )
+    jwks = json.loads(jsonurl.read())
+    _jwks_cache['keys'] = {
+        key['kid']: {
+            'kty': key['kty'],
+            'kid': key['kid'],
+            'use': key['use'],
+            'n': key['n'],
+            'e': key['e']
+        }
+        for key in jwks['keys']
+    }
+
+'''
+@INPUTS
+    kid: the key id from the token header
+
+returns true when the cached JWKS should be fetched again for kid
+'''
+def jwks_stale(kid):
+    now = time.time()
+    if now >= _jwks_cache['expires_at']:
+        return True
+    return kid not in _jwks_cache['keys'] and now >= _jwks_cache['retry_at']
+
+'''
+Fetches the JWKS, keeping the previous keys if Auth0 cannot be reached
+'''
+def refresh_jwks():
+    # the next attempt is scheduled before fetching,
+    # so even an unexpected error cannot trigger a fetch on every request
+    now = time.time()
+    _jwks_cache['expires_at'] = now + JWKS_MIN_REFRESH
+    _jwks_cache['retry_at'] = now + JWKS_MIN_REFRESH
+
+    try:
+        fetch_jwks()
+    except (OSError, HTTPException, ValueError, KeyError, TypeError):
+        return
+
+    _jwks_cache['expires_at'] = now + JWKS_CACHE_TTL
+
+'''
+@INPUTS
+    kid: the key id from the token header
+
+returns the cached RSA key for kid, refreshing the JWKS when it is stale
+    only one request refreshes at a time, requests for a known kid
+    keep using the cached key instead of waiting for the refresh
+returns an empty dict if Auth0 does not publish the key
+'''
+def get_rsa_key(kid):
+    if jwks_stale(kid):
+        known = kid in _jwks_cache['keys']
+        if _jwks_lock.acquire(blocking=not known):
+            try:
+                if jwks_stale(kid):
+                    refresh_jwks()
+            finally:
+                _jwks_lock.release()
+    return _jwks_cache['keys'].get(kid, {})
+
 '''
 @INPUTS
     token: a json web token (string)
@@ -95,25 +181,14 @@ return the decoded payload
 !!NOTE urlopen has a common certificate error described here: https://stackoverflow.com/questions/50236117/scraping-ssl-certificate-verify-failed-error-for-http-en-wikipedia-org
 '''
 def verify_decode_jwt(token):
-    jsonurl = urlopen(f'https://{AUTH0_DOMAIN}/.well-known/jwks.json')
-    jwks = json.loads(jsonurl.read())
     unverified_header = jwt.get_unverified_header(token)
-    rsa_key = {}
     if 'kid' not in unverified_header:
         raise AuthError({
             'code': 'invalid_header',
             'description': 'Authorization malformed.'
         }, 401)
 
-    for key in jwks['keys']:
-        if key['kid'] == unverified_header['kid']:
-            rsa_key = {
-                'kty': key['kty'],
-                'kid': key['kid'],
-                'use': key['use'],
-                'n': key['n'],
-                'e': key['e']
-            }
+    rsa_key = get_rsa_key(unverified_header['kid'])
     if rsa_key:
         try:
             payload = jwt.decode(
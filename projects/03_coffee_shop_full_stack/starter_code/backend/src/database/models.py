@@ -1,5 +1,6 @@
 import os
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from flask_sqlalchemy import SQLAlchemy
 import json
 
@@ -36,7 +37,7 @@ def db_drop_and_create_all():
     # add one demo row which is helping in POSTMAN test
     drink = Drink(
         title='water',
-        recipe='[{"name": "water", "color": "blue", "parts": 1}]'
+        recipe=[{"name": "water", "color": "blue", "parts": 1}]
     )
 
 
@@ -54,9 +55,9 @@ class Drink(db.Model):
     id = Column(Integer().with_variant(Integer, "sqlite"), primary_key=True)
     # String Title
     title = Column(String(80), unique=True)
-    # the ingredients blob - this stores a lazy json blob
+    # the ingredients blob - this stores a json document, as JSONB on postgres
     # the required datatype is [{'color': string, 'name':string, 'parts':number}]
-    recipe = Column(String(180), nullable=False)
+    recipe = Column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
 
     '''
     short()
@@ -64,15 +65,35 @@ class Drink(db.Model):
     '''
 
     def short(self):
-        print(json.loads(self.recipe))
-        short_recipe = [{'color': r['color'], 'parts': r['parts']} for r in json.loads(self.recipe)]
-        print(short_recipe)
+        return Drink.short_form(self.id, self.title, self.recipe)
+
+    '''
+    short_form(drink_id, title, recipe)
+        builds the short form representation from raw column values
+    '''
+
+    @staticmethod
+    def short_form(drink_id, title, recipe):
+        short_recipe = [{'color': r['color'], 'parts': r['parts']} for r in recipe]
         return {
-            'id': self.id,
-            'title': self.title,
+            'id': drink_id,
+            'title': title,
             'recipe': short_recipe
         }
 
+    '''
+    short_rows()
+        short form representation of every Drink
+        reads the columns directly instead of loading Drink models
+        EXAMPLE
+            drinks = Drink.short_rows()
+    '''
+
+    @classmethod
+    def short_rows(cls):
+        rows = db.session.query(cls.id, cls.title, cls.recipe).all()
+        return [cls.short_form(drink_id, title, recipe) for drink_id, title, recipe in rows]
+
     '''
     long()
         long form representation of the Drink model
@@ -82,7 +103,7 @@ class Drink(db.Model):
         return {
             'id': self.id,
             'title': self.title,
-            'recipe': json.loads(self.recipe)
+            'recipe': self.recipe
         }
 
     '''